@@ -5,9 +5,11 @@ from typing import Dict, Tuple, Optional, Sequence, Type, List
 from functools import lru_cache, wraps
 from concurrent.futures import ThreadPoolExecutor
 import threading
+import queue
+from contextlib import contextmanager
 from abc import abstractmethod
 
-from data_diff.utils import is_uuid, safezip
+from data_diff.utils import is_uuid, safezip, UUID_PATTERN
 from .database_types import (
     ColType_UUID,
     AbstractDatabase,
@@ -19,7 +21,7 @@ from .database_types import (
     UnknownColType,
     Text,
 )
-from data_diff.sql import DbPath, SqlOrStr, Compiler, Explain, Select, TableName
+from data_diff.sql import DbPath, Sql, SqlOrStr, SqlTemplate, Compiler, Explain, Select, TableName
 
 logger = logging.getLogger("database")
 
@@ -58,10 +60,60 @@ def _one(seq):
     return x
 
 
+def _pairs(row: Sequence) -> List[Tuple[int, int]]:
+    "Group a flat row of counts into pairs, i.e. (a, b, c, d) -> [(a, b), (c, d)]"
+    counts = [int(c or 0) for c in row]
+    return list(zip(counts[::2], counts[1::2]))
+
+
+def _res_raw(res, sql_code: str):
+    return res
+
+
+def _res_int(res, sql_code: str):
+    assert len(res) == 1 and len(res[0]) == 1, (sql_code, res)
+    res = res[0][0]
+    if res is None:  # May happen due to sum() of 0 items
+        return None
+    return int(res)
+
+
+def _res_tuple(res, sql_code: str):
+    assert len(res) == 1, (sql_code, res)
+    return res[0]
+
+
+def _res_list_of_one(res, sql_code: str):
+    return [_one(row) for row in res]
+
+
+def _res_list_of_tuples(res, sql_code: str):
+    return [tuple(row) for row in res]
+
+
+@lru_cache()
+def _result_converter(res_type: type):
+    "Returns a function (res, sql_code) -> converted_res, that converts query results to 'res_type'"
+    if res_type is int:
+        return _res_int
+    elif res_type is tuple:
+        return _res_tuple
+    elif getattr(res_type, "__origin__", None) is list and len(res_type.__args__) == 1:
+        if res_type.__args__ == (int,) or res_type.__args__ == (str,):
+            return _res_list_of_one
+        elif res_type.__args__ == (Tuple,):
+            return _res_list_of_tuples
+        else:
+            raise ValueError(res_type)
+    return _res_raw
+
+
 def _query_conn(conn, sql_code: str) -> list:
     c = conn.cursor()
     c.execute(sql_code)
-    if sql_code.lower().startswith("select"):
+    # Per DB-API, description is None for statements that don't return rows.
+    # (cheaper than inspecting the SQL, which can be very long)
+    if c.description is not None:
         return c.fetchall()
 
 
@@ -76,6 +128,20 @@ class Database(AbstractDatabase):
     TYPE_CLASSES: Dict[str, type] = {}
     default_schema: str = None
 
+    def __init__(self):
+        # Memoized results of query_table_schema(), keyed by (path, filter_columns). See invalidate_schema()
+        self._schema_cache: Dict[tuple, Dict[str, ColType]] = {}
+        self._schema_cache_lock = threading.Lock()
+        # Memoized results of _parse_type(), keyed by (type_repr, datetime_precision, numeric_precision, numeric_scale)
+        self._coltype_cache: Dict[tuple, ColType] = {}
+        # Compiled SqlTemplates of query_template(), keyed by their (hashable) AST.
+        # Grows with the number of distinct query shapes (roughly one per table and column set), not with the
+        # number of queries, since the values that vary (like key bounds) are left as Params.
+        self._template_cache: Dict[Sql, SqlTemplate] = {}
+        self._template_cache_lock = threading.Lock()
+        # Compiler is immutable (nested contexts are derived with replace()), so one instance can be shared
+        self._compiler = Compiler(self)
+
     @property
     def name(self):
         return type(self).__name__
@@ -83,34 +149,71 @@ class Database(AbstractDatabase):
     def query(self, sql_ast: SqlOrStr, res_type: type):
         "Query the given SQL code/AST, and attempt to convert the result to type 'res_type'"
 
-        compiler = Compiler(self)
+        compiler = self._compiler
         sql_code = compiler.compile(sql_ast)
         logger.debug("Running SQL (%s): %s", type(self).__name__, sql_code)
         if getattr(self, "_interactive", False) and isinstance(sql_ast, Select):
-            explained_sql = compiler.compile(Explain(sql_ast))
-            logger.info(f"EXPLAIN for SQL SELECT")
-            logger.info(self._query(explained_sql))
-            answer = input("Continue? [y/n] ")
-            if not answer.lower() in ["y", "yes"]:
-                sys.exit(1)
-
-        res = self._query(sql_code)
-        if res_type is int:
-            res = _one(_one(res))
-            if res is None:  # May happen due to sum() of 0 items
-                return None
-            return int(res)
-        elif res_type is tuple:
-            assert len(res) == 1, (sql_code, res)
-            return res[0]
-        elif getattr(res_type, "__origin__", None) is list and len(res_type.__args__) == 1:
-            if res_type.__args__ == (int,) or res_type.__args__ == (str,):
-                return [_one(row) for row in res]
-            elif res_type.__args__ == (Tuple,):
-                return [tuple(row) for row in res]
-            else:
-                raise ValueError(res_type)
-        return res
+            self._explain_and_confirm(compiler.compile(Explain(sql_ast)))
+
+        convert = _result_converter(res_type)
+        if res_type == List[Tuple]:
+            res = self._query_rows(sql_code)
+        else:
+            res = self._query(sql_code)
+        return convert(res, sql_code)
+
+    def query_template(self, sql_ast: Sql, res_type: type, **params: SqlOrStr):
+        """Like query(), but for an AST containing Param placeholders, which are bound to 'params'.
+
+        The compiled template is cached, so 'sql_ast' must be hashable (i.e. use tuples, not lists).
+        """
+        sql_code = self._get_template(sql_ast).bind(**params)
+        if getattr(self, "_interactive", False) and isinstance(sql_ast, Select):
+            self._explain_and_confirm(self._compiler.compile_template(Explain(sql_ast)).bind(**params))
+        return self.query(sql_code, res_type)
+
+    def _get_template(self, sql_ast: Sql) -> SqlTemplate:
+        try:
+            return self._template_cache[sql_ast]
+        except KeyError:
+            pass
+
+        # Compile outside the lock. If two threads race, both templates are identical, and the first one is kept.
+        template = self._compiler.compile_template(sql_ast)
+        with self._template_cache_lock:
+            return self._template_cache.setdefault(sql_ast, template)
+
+    def _explain_and_confirm(self, explained_sql: str):
+        logger.info(f"EXPLAIN for SQL SELECT")
+        logger.info(self._query(explained_sql))
+        answer = input("Continue? [y/n] ")
+        if not answer.lower() in ["y", "yes"]:
+            sys.exit(1)
+
+    def _query_rows(self, sql_code: str) -> list:
+        """Like _query(), but for queries that download a potentially large amount of rows.
+
+        Implementations may override it to stream the results, instead of buffering them twice.
+        """
+        return self._query(sql_code)
+
+    def query_many(self, sql_asts: Sequence[SqlOrStr], res_type: type) -> list:
+        """Query several independent SQL codes/ASTs, and return a list of their results, each converted to 'res_type'.
+
+        Databases that support it receive all the queries in a single round-trip.
+        """
+        compiler = self._compiler
+        sql_codes = [compiler.compile(sql_ast) for sql_ast in sql_asts]
+        convert = _result_converter(res_type)
+        return [convert(res, sql_code) for res, sql_code in safezip(self._query_multi(sql_codes), sql_codes)]
+
+    def _query_multi(self, sql_codes: Sequence[str]) -> list:
+        """Send several queries to the database, and return a list of their results.
+
+        Implementations may batch them into a single round-trip.
+        """
+        logger.debug("Running SQL (%s): %s", type(self).__name__, "; ".join(sql_codes))
+        return [self._query(sql_code) for sql_code in sql_codes]
 
     def enable_interactive(self):
         self._interactive = True
@@ -118,6 +221,8 @@ class Database(AbstractDatabase):
     def _convert_db_precision_to_digits(self, p: int) -> int:
         """Convert from binary precision, used by floats, to decimal precision."""
         # See: https://en.wikipedia.org/wiki/Single-precision_floating-point_format
+        if 0 <= p < len(_PRECISION_DIGITS):
+            return _PRECISION_DIGITS[p]
         return math.floor(math.log(2**p, 10))
 
     def _parse_type_repr(self, type_repr: str) -> Optional[Type[ColType]]:
@@ -134,6 +239,28 @@ class Database(AbstractDatabase):
     ) -> ColType:
         """ """
 
+        # ColTypes are immutable, so the same instance can be shared between columns
+        key = type_repr, datetime_precision, numeric_precision, numeric_scale
+        try:
+            return self._coltype_cache[key]
+        except KeyError:
+            pass
+
+        coltype = self._parse_type_uncached(
+            table_path, col_name, type_repr, datetime_precision, numeric_precision, numeric_scale
+        )
+        self._coltype_cache[key] = coltype
+        return coltype
+
+    def _parse_type_uncached(
+        self,
+        table_path: DbPath,
+        col_name: str,
+        type_repr: str,
+        datetime_precision: int = None,
+        numeric_precision: int = None,
+        numeric_scale: int = None,
+    ) -> ColType:
         cls = self._parse_type_repr(type_repr)
         if not cls:
             return UnknownColType(type_repr)
@@ -167,45 +294,147 @@ class Database(AbstractDatabase):
 
         raise TypeError(f"Parsing {type_repr} returned an unknown type '{cls}'.")
 
-    def select_table_schema(self, path: DbPath) -> str:
+    def select_table_schema(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None) -> str:
         schema, table = self._normalize_table_path(path)
 
         return (
             "SELECT column_name, data_type, datetime_precision, numeric_precision, numeric_scale FROM information_schema.columns "
             f"WHERE table_name = '{table}' AND table_schema = '{schema}'"
+            + self._filter_columns_sql("column_name", filter_columns)
         )
 
-    def query_table_schema(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None) -> Dict[str, ColType]:
-        rows = self.query(self.select_table_schema(path), list)
-        if not rows:
-            raise RuntimeError(f"{self.name}: Table '{'.'.join(path)}' does not exist, or has no columns")
+    def _filter_columns_sql(self, name_expr: str, filter_columns: Optional[Sequence[str]]) -> str:
+        """Provide an SQL condition (prefixed with AND) restricting 'name_expr' to the given columns, case-insensitive
 
-        if filter_columns is not None:
-            accept = {i.lower() for i in filter_columns}
-            rows = [r for r in rows if r[0].lower() in accept]
+        No filter is applied if 'filter_columns' is None. An empty list matches no columns.
+        """
+        if filter_columns is None:
+            return ""
+        if not filter_columns:
+            return " AND 1 = 0"
 
-        col_dict: Dict[str, ColType] = {row[0]: self._parse_type(path, *row) for row in rows}
+        names = ", ".join("'%s'" % c.lower().replace("'", "''") for c in filter_columns)
+        return f" AND LOWER({name_expr}) IN ({names})"
 
-        self._refine_coltypes(path, col_dict)
+    def _schema_cache_key(self, path: DbPath, filter_columns: Optional[Sequence[str]]) -> tuple:
+        return tuple(path), None if filter_columns is None else frozenset(c.lower() for c in filter_columns)
 
-        # Return a dict of form {name: type} after normalization
+    def query_table_schema(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None) -> Dict[str, ColType]:
+        # Shares the caching and type refinement of query_table_schemas()
+        (col_dict,) = self.query_table_schemas([path], [filter_columns])
         return col_dict
 
-    def _refine_coltypes(self, table_path: DbPath, col_dict: Dict[str, ColType]):
+    def query_table_schemas(
+        self, paths: Sequence[DbPath], filter_columns_per_path: Optional[Sequence[Optional[Sequence[str]]]] = None
+    ) -> List[Dict[str, ColType]]:
+        """Query the schemas of several tables concurrently, overlapping their round-trips.
+
+        Returns a list of {column: type}, in the same order as 'paths'. The results are cached, and each call
+        returns copies, so callers may modify them without affecting the cache.
+
+        Text columns of tables that need sampling to detect UUIDs are refined together, with refine_coltypes_batch().
+        """
+        if filter_columns_per_path is None:
+            filter_columns_per_path = [None] * len(paths)
+        assert len(filter_columns_per_path) == len(paths)
+
+        keys = list(map(self._schema_cache_key, paths, filter_columns_per_path))
+        with self._schema_cache_lock:
+            missing = {
+                key: args
+                for key, args in zip(keys, zip(paths, filter_columns_per_path))
+                if key not in self._schema_cache
+            }
+
+        if missing:
+            max_workers = min(len(missing), MAX_SCHEMA_THREADS)
+            thread_count = getattr(self, "thread_count", None)
+            if thread_count:
+                # No point in having more threads than connections
+                max_workers = min(max_workers, thread_count)
+
+            args = list(missing.values())
+            if max_workers <= 1:
+                described = [self._query_unrefined_schema(*a) for a in args]
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    described = list(pool.map(lambda a: self._query_unrefined_schema(*a), args))
+
+            # Tables whose UUID samples weren't counted by _describe_table() are refined together
+            to_refine = []
+            for (path, _), (col_dict, uuid_counts) in zip(args, described):
+                if uuid_counts is None:
+                    to_refine.append((path, col_dict))
+                else:
+                    self._refine_coltypes(path, col_dict, uuid_counts)
+            self.refine_coltypes_batch(to_refine)
+
+            with self._schema_cache_lock:
+                for key, (col_dict, _) in zip(missing, described):
+                    self._schema_cache[key] = col_dict
+
+        with self._schema_cache_lock:
+            return [dict(self._schema_cache[key]) for key in keys]
+
+    def invalidate_schema(self, path: Optional[DbPath] = None):
+        """Forget the cached schemas of the table in 'path', for all the column filters it was queried with.
+
+        Call it after altering or dropping a table. If 'path' is None, the whole cache is cleared.
+        """
+        with self._schema_cache_lock:
+            if path is None:
+                self._schema_cache.clear()
+                return
+
+            path = tuple(path)
+            for key in [key for key in self._schema_cache if key[0] == path]:
+                del self._schema_cache[key]
+
+    def _query_unrefined_schema(
+        self, path: DbPath, filter_columns: Optional[Sequence[str]] = None
+    ) -> Tuple[Dict[str, ColType], Optional[Dict[str, Tuple[int, int]]]]:
+        "Query the column types, before _refine_coltypes(), along with the UUID sample counts of _describe_table()"
+        rows, uuid_counts = self._describe_table(path, filter_columns)
+        if not rows:
+            if filter_columns:
+                raise RuntimeError(
+                    f"{self.name}: Table '{'.'.join(path)}' does not exist, "
+                    f"or has none of the columns: {', '.join(filter_columns)}"
+                )
+            raise RuntimeError(f"{self.name}: Table '{'.'.join(path)}' does not exist, or has no columns")
+
+        col_dict: Dict[str, ColType] = {row[0]: self._parse_type(path, *row) for row in rows}
+        return col_dict, uuid_counts
+
+    def _describe_table(
+        self, path: DbPath, filter_columns: Optional[Sequence[str]] = None
+    ) -> Tuple[list, Optional[Dict[str, Tuple[int, int]]]]:
+        """Query the rows of select_table_schema(), restricted to filter_columns, and optionally the UUID sample counts.
+
+        The counts are returned as {column.lower(): (uuid_count, total)}, or None if they weren't queried.
+        Implementations that can count the samples without knowing the column types should do it here,
+        in the same round-trip.
+        """
+        return self.query(self.select_table_schema(path, filter_columns), list), None
+
+    def _refine_coltypes(
+        self, table_path: DbPath, col_dict: Dict[str, ColType], uuid_counts: Dict[str, Tuple[int, int]] = None
+    ):
         "Refine the types in the column dict, by querying the database for a sample of their values"
 
         text_columns = [k for k, v in col_dict.items() if isinstance(v, Text)]
         if not text_columns:
             return
 
-        fields = [self.normalize_uuid(c, ColType_UUID()) for c in text_columns]
-        samples_by_row = self.query(Select(fields, TableName(table_path), limit=16), list)
-        samples_by_col = list(zip(*samples_by_row))
-        for col_name, samples in safezip(text_columns, samples_by_col):
-            uuid_samples = list(filter(is_uuid, samples))
+        if uuid_counts is None:
+            counts = self._count_uuid_samples(table_path, text_columns)
+            assert len(counts) == len(text_columns)
+            uuid_counts = {c.lower(): n for c, n in zip(text_columns, counts)}
 
-            if uuid_samples:
-                if len(uuid_samples) != len(samples):
+        for col_name in text_columns:
+            uuid_count, total = uuid_counts[col_name.lower()]
+            if uuid_count:
+                if uuid_count != total:
                     logger.warning(
                         f"Mixed UUID/Non-UUID values detected in column {'.'.join(table_path)}.{col_name}, disabling UUID support."
                     )
@@ -213,9 +442,71 @@ class Database(AbstractDatabase):
                     assert col_name in col_dict
                     col_dict[col_name] = ColType_UUID()
 
-    # @lru_cache()
-    # def get_table_schema(self, path: DbPath) -> Dict[str, ColType]:
-    #     return self.query_table_schema(path)
+    def refine_coltypes_batch(self, tables: Sequence[Tuple[DbPath, Dict[str, ColType]]]):
+        """Like _refine_coltypes(), for several tables at once. The column dicts are updated in place.
+
+        The sample queries are sent together using query_many(), so their round-trips overlap.
+        """
+        pending = []
+        for table_path, col_dict in tables:
+            text_columns = [k for k, v in col_dict.items() if isinstance(v, Text)]
+            if text_columns:
+                pending.append((table_path, col_dict, text_columns))
+
+        if len(pending) <= 1:
+            for table_path, col_dict, _ in pending:
+                self._refine_coltypes(table_path, col_dict)
+            return
+
+        try:
+            selects = [self._select_uuid_counts(table_path, text_columns) for table_path, _, text_columns in pending]
+        except NotImplementedError:
+            for table_path, col_dict, _ in pending:
+                self._refine_coltypes(table_path, col_dict)
+            return
+
+        for (table_path, col_dict, text_columns), row in safezip(pending, self.query_many(selects, tuple)):
+            counts = _pairs(row)
+            assert len(counts) == len(text_columns)
+            uuid_counts = {c.lower(): n for c, n in zip(text_columns, counts)}
+            self._refine_coltypes(table_path, col_dict, uuid_counts)
+
+    def _select_uuid_counts(self, table_path: DbPath, columns: Sequence[str]) -> Select:
+        """Provide a query that counts, for each column, how many of the sampled (non-null) values are UUIDs.
+
+        The result is a single row of the form (uuid_count1, total1, uuid_count2, total2, ...)
+
+        Raises NotImplementedError if the database doesn't support regexp_match().
+        """
+        fields = [self.normalize_uuid(self.quote(c), ColType_UUID()) for c in columns]
+        matches = [self.regexp_match(f"c{i}", UUID_REGEXP) for i in range(len(fields))]
+
+        sample = Select([f"{f} AS c{i}" for i, f in enumerate(fields)], TableName(table_path), limit=UUID_SAMPLE_SIZE)
+        aggregates = []
+        for i, match in enumerate(matches):
+            aggregates += [f"sum(CASE WHEN {match} THEN 1 ELSE 0 END)", f"count(c{i})"]
+
+        compiled_sample = self._compiler.compile(sample)
+        return Select(aggregates, f"({compiled_sample}) tmp")
+
+    def _count_uuid_samples(self, table_path: DbPath, text_columns: List[str]) -> List[Tuple[int, int]]:
+        """For each column, count how many of the sampled (non-null) values are UUIDs.
+
+        Returns a list of (uuid_count, total) per column. When the database supports regexp_match(),
+        the counting is done in a single aggregate query, and only the counts are transferred.
+        """
+        try:
+            select = self._select_uuid_counts(table_path, text_columns)
+        except NotImplementedError:
+            fields = [self.normalize_uuid(self.quote(c), ColType_UUID()) for c in text_columns]
+            samples_by_row = self.query(Select(fields, TableName(table_path), limit=UUID_SAMPLE_SIZE), list)
+            counts = []
+            for i in range(len(fields)):
+                samples = [row[i] for row in samples_by_row if row[i] is not None]
+                counts.append((sum(map(is_uuid, samples)), len(samples)))
+            return counts
+
+        return _pairs(self.query(select, tuple))
 
     def _normalize_table_path(self, path: DbPath) -> DbPath:
         if len(path) == 1:
@@ -238,41 +529,126 @@ class Database(AbstractDatabase):
     def normalize_uuid(self, value: str, coltype: ColType_UUID) -> str:
         return f"TRIM({value})"
 
+    def regexp_match(self, value: str, pattern: str) -> str:
+        "Provide SQL for a boolean expression, testing if 'value' matches the regular expression 'pattern'"
+        raise NotImplementedError()
+
+    def close(self):
+        with self._schema_cache_lock:
+            self._schema_cache.clear()
+
 
 class ThreadedDatabase(Database):
-    """Access the database through singleton threads.
+    """Access the database through a pool of worker threads and connections.
 
     Used for database connectors that do not support sharing their connection between different threads.
+    Each connection is used by one thread at a time. Connections are opened lazily, up to max_pool_size
+    (default: thread_count), and are returned to the pool after each query.
     """
 
-    def __init__(self, thread_count=1):
-        self._init_error = None
-        self._queue = ThreadPoolExecutor(thread_count, initializer=self.set_conn)
+    def __init__(self, thread_count=1, max_pool_size=None):
+        super().__init__()
+        self.thread_count = thread_count
+        self.max_pool_size = max_pool_size or thread_count
+        self._pool = queue.Queue()
+        self._pool_lock = threading.Lock()
+        self._pool_size = 0
+        self._opened_connections = []
+        self._queue = ThreadPoolExecutor(thread_count, initializer=self._init_worker)
         self.thread_local = threading.local()
 
-    def set_conn(self):
-        assert not hasattr(self.thread_local, "conn")
+    def _init_worker(self):
+        self.thread_local.is_worker = True
+
+    def _checkout_connection(self):
         try:
-            self.thread_local.conn = self.create_connection()
-        except ModuleNotFoundError as e:
-            self._init_error = e
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
 
-    def _query(self, sql_code: str):
-        r = self._queue.submit(self._query_in_worker, sql_code)
+        with self._pool_lock:
+            can_open = self._pool_size < self.max_pool_size
+            if can_open:
+                self._pool_size += 1
+
+        if not can_open:
+            # Pool is at its limit. Wait for another thread to return a connection.
+            return self._pool.get()
+
+        try:
+            conn = self.create_connection()
+        except BaseException:
+            with self._pool_lock:
+                self._pool_size -= 1
+            raise
+
+        with self._pool_lock:
+            self._opened_connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        "Check out a connection from the pool for the duration of the context. Nested calls reuse the same connection."
+        conn = getattr(self.thread_local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._checkout_connection()
+        self.thread_local.conn = conn
+        try:
+            yield conn
+        finally:
+            self.thread_local.conn = None
+            self._pool.put(conn)
+
+    def _run_in_worker(self, func, *args):
+        if getattr(self.thread_local, "is_worker", False):
+            # Already running in one of our workers. Submitting would cost a round-trip through the
+            # queue, and might deadlock if all the workers are busy waiting.
+            return func(*args)
+
+        r = self._queue.submit(func, *args)
         return r.result()
 
+    def _query(self, sql_code: str):
+        return self._run_in_worker(self._query_in_worker, sql_code)
+
     def _query_in_worker(self, sql_code: str):
         "This method runs in a worker thread"
-        if self._init_error:
-            raise self._init_error
-        return _query_conn(self.thread_local.conn, sql_code)
+        with self._connection() as conn:
+            return _query_conn(conn, sql_code)
+
+    def _query_multi(self, sql_codes: Sequence[str]) -> list:
+        logger.debug("Running SQL (%s): %s", type(self).__name__, "; ".join(sql_codes))
+        # The queries run in order, on a single connection, so that statements like COMMIT apply to the ones before
+        return self._run_in_worker(self._query_multi_in_worker, sql_codes)
+
+    def _query_multi_in_worker(self, sql_codes: Sequence[str]) -> list:
+        "This method runs in a worker thread"
+        with self._connection() as conn:
+            return self._query_conn_multi(conn, sql_codes)
+
+    def _query_conn_multi(self, conn, sql_codes: Sequence[str]) -> list:
+        """Run several queries in order, on the given connection. Override to batch them into a single round-trip.
+
+        The connection is checked out by the current worker, so the nested _query() calls reuse it,
+        while keeping the error handling of subclasses.
+        """
+        return [self._query(sql_code) for sql_code in sql_codes]
 
     @abstractmethod
     def create_connection(self):
         ...
 
     def close(self):
+        super().close()
         self._queue.shutdown()
+        with self._pool_lock:
+            for conn in self._opened_connections:
+                conn.close()
+            self._opened_connections.clear()
+            self._pool_size = 0
 
 
 CHECKSUM_HEXDIGITS = 15  # Must be 15 or lower
@@ -285,3 +661,11 @@ DEFAULT_DATETIME_PRECISION = 6
 DEFAULT_NUMERIC_PRECISION = 24
 
 TIMESTAMP_PRECISION_POS = 20  # len("2022-06-03 12:24:35.") == 20
+
+MAX_SCHEMA_THREADS = 8
+
+UUID_SAMPLE_SIZE = 16
+
+# Decimal digits for each binary precision, as computed by Database._convert_db_precision_to_digits()
+_PRECISION_DIGITS = tuple(math.floor(math.log(2**p, 10)) for p in range(129))
+UUID_REGEXP = f"^{UUID_PATTERN}$"
@@ -28,6 +28,8 @@ class BigQuery(Database):
     ROUNDS_ON_PREC_LOSS = False  # Technically BigQuery doesn't allow implicit rounding or truncation
 
     def __init__(self, project, *, dataset, **kw):
+        super().__init__()
+
         bigquery = import_bigquery()
 
         self._client = bigquery.Client(project, **kw)
@@ -64,14 +66,16 @@ class BigQuery(Database):
         return f"cast({s} as string)"
 
     def close(self):
+        super().close()
         self._client.close()
 
-    def select_table_schema(self, path: DbPath) -> str:
+    def select_table_schema(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None) -> str:
         schema, table = self._normalize_table_path(path)
 
         return (
             f"SELECT column_name, data_type, 6 as datetime_precision, 38 as numeric_precision, 9 as numeric_scale FROM {schema}.INFORMATION_SCHEMA.COLUMNS "
             f"WHERE table_name = '{table}' AND table_schema = '{schema}'"
+            + self._filter_columns_sql("column_name", filter_columns)
         )
 
     def normalize_timestamp(self, value: str, coltype: TemporalType) -> str:
@@ -92,6 +96,9 @@ class BigQuery(Database):
     def normalize_number(self, value: str, coltype: FractionalType) -> str:
         return f"format('%.{coltype.precision}f', {value})"
 
+    def regexp_match(self, value: str, pattern: str) -> str:
+        return f"REGEXP_CONTAINS({value}, r'{pattern}')"
+
     def parse_table_name(self, name: str) -> DbPath:
         path = parse_table_name(name)
         return self._normalize_table_path(path)
@@ -122,8 +122,11 @@ class AbstractDatabase(ABC):
         ...
 
     @abstractmethod
-    def select_table_schema(self, path: DbPath) -> str:
-        "Provide SQL for selecting the table schema as (name, type, date_prec, num_prec)"
+    def select_table_schema(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None) -> str:
+        """Provide SQL for selecting the table schema as (name, type, date_prec, num_prec)
+
+        If 'filter_columns' is given, only the matching columns (case-insensitive) are selected.
+        """
         ...
 
     @abstractmethod
@@ -1,8 +1,18 @@
+import re
+
+from data_diff.utils import safezip
 from .database_types import *
-from .base import ThreadedDatabase, import_helper, ConnectError
+from .base import ThreadedDatabase, import_helper, ConnectError, _one, _pairs
 from .base import MD5_HEXDIGITS, CHECKSUM_HEXDIGITS, TIMESTAMP_PRECISION_POS
 
 
+# Parses the 'Type' field of SHOW COLUMNS, e.g. "decimal(18,4)" or "bigint unsigned"
+_COLUMN_TYPE_RE = re.compile(r"(\w+)(?:\((\d+)(?:,(\d+))?\))?")
+
+# Reported by information_schema when no precision is specified
+_DEFAULT_FLOAT_PRECISION = {"float": 12, "double": 22}
+
+
 @import_helper("mysql")
 def import_mysql():
     import mysql.connector
@@ -71,3 +81,62 @@ class MySQL(ThreadedDatabase):
 
     def normalize_uuid(self, value: str, coltype: ColType_UUID) -> str:
         return f"TRIM(CAST({value} AS char))"
+
+    def regexp_match(self, value: str, pattern: str) -> str:
+        return f"{value} REGEXP '{pattern}'"
+
+    def _query_conn_multi(self, conn, sql_codes: Sequence[str]) -> list:
+        c = conn.cursor()
+        return [r.fetchall() if r.with_rows else None for r in c.execute(";".join(sql_codes), multi=True)]
+
+    def _show_columns(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None) -> str:
+        # SHOW COLUMNS reads the table definition directly, which is much faster than
+        # querying information_schema on servers with many schemas.
+        schema, table = self._normalize_table_path(path)
+        sql = f"SHOW COLUMNS FROM {self.quote(schema)}.{self.quote(table)}"
+        if filter_columns is not None:
+            sql += " WHERE TRUE" + self._filter_columns_sql("Field", filter_columns)
+        return sql
+
+    def _parse_show_columns_row(self, row: tuple) -> tuple:
+        "Convert a row of SHOW COLUMNS to the form returned by select_table_schema()"
+        name, type_str = row[:2]
+        if isinstance(type_str, (bytes, bytearray)):
+            type_str = type_str.decode()
+
+        m = _COLUMN_TYPE_RE.match(type_str)
+        data_type, precision, scale = m.group(1).lower(), m.group(2), m.group(3)
+
+        if data_type in ("datetime", "timestamp"):
+            return name, data_type, int(precision or 0), None, None
+        elif data_type == "decimal":
+            return name, data_type, None, int(precision), int(scale or 0)
+        elif data_type in _DEFAULT_FLOAT_PRECISION:
+            precision = int(precision) if precision else _DEFAULT_FLOAT_PRECISION[data_type]
+            return name, data_type, None, precision, scale and int(scale)
+        return name, data_type, None, None, None
+
+    def _describe_table(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None):
+        mysql = import_mysql()
+        show_columns = self._show_columns(path, filter_columns)
+
+        if filter_columns:
+            # In MySQL normalize_uuid() accepts values of any type, so we can count the UUID samples
+            # before knowing which columns are text, and send it in the same round-trip as the schema query.
+            counts_sql = self._compiler.compile(self._select_uuid_counts(path, filter_columns))
+            try:
+                rows, counts = self._query_multi([show_columns, counts_sql])
+            except mysql.Error:
+                # Probably a missing table or column. Let the regular path report it.
+                pass
+            else:
+                uuid_counts = {c.lower(): n for c, n in safezip(filter_columns, _pairs(_one(counts)))}
+                return [self._parse_show_columns_row(r) for r in rows], uuid_counts
+
+        try:
+            rows = self.query(show_columns, list)
+        except mysql.Error as e:
+            if e.errno == mysql.errorcode.ER_NO_SUCH_TABLE:
+                return [], None
+            raise
+        return [self._parse_show_columns_row(r) for r in rows], None
@@ -56,12 +56,13 @@ class Oracle(ThreadedDatabase):
     def to_string(self, s: str):
         return f"cast({s} as varchar(1024))"
 
-    def select_table_schema(self, path: DbPath) -> str:
+    def select_table_schema(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None) -> str:
         schema, table = self._normalize_table_path(path)
 
         return (
             f"SELECT column_name, data_type, 6 as datetime_precision, data_precision as numeric_precision, data_scale as numeric_scale"
             f" FROM ALL_TAB_COLUMNS WHERE table_name = '{table.upper()}' AND owner = '{schema.upper()}'"
+            + self._filter_columns_sql("column_name", filter_columns)
         )
 
     def normalize_timestamp(self, value: str, coltype: TemporalType) -> str:
@@ -107,3 +108,6 @@ class Oracle(ThreadedDatabase):
     def normalize_uuid(self, value: str, coltype: ColType_UUID) -> str:
         # Cast is necessary for correct MD5 (trimming not enough)
         return f"CAST(TRIM({value}) AS VARCHAR(36))"
+
+    def regexp_match(self, value: str, pattern: str) -> str:
+        return f"REGEXP_LIKE({value}, '{pattern}')"
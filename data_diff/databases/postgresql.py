@@ -32,6 +32,8 @@ class PostgreSQL(ThreadedDatabase):
         "text": Text,
     }
     ROUNDS_ON_PREC_LOSS = True
+    SUPPORTS_SERVER_SIDE_CURSORS = True
+    FETCH_BATCH_SIZE = 10_000
 
     default_schema = "public"
 
@@ -53,6 +55,26 @@ class PostgreSQL(ThreadedDatabase):
         except pg.OperationalError as e:
             raise ConnectError(*e.args) from e
 
+    def _query_rows(self, sql_code: str) -> list:
+        if not self.SUPPORTS_SERVER_SIDE_CURSORS:
+            return super()._query_rows(sql_code)
+        return self._run_in_worker(self._query_rows_in_worker, sql_code)
+
+    def _query_rows_in_worker(self, sql_code: str) -> list:
+        "This method runs in a worker thread"
+        # A named cursor keeps the result set on the server, and fetches it in batches.
+        # Otherwise, libpq would buffer the entire result before we convert it to Python objects.
+        with self._connection() as conn:
+            c = conn.cursor(name="data_diff_rows")
+            try:
+                c.execute(sql_code)
+                rows = []
+                for batch in iter(lambda: c.fetchmany(self.FETCH_BATCH_SIZE), []):
+                    rows += batch
+                return rows
+            finally:
+                c.close()
+
     def quote(self, s: str):
         return f'"{s}"'
 
@@ -73,3 +95,6 @@ class PostgreSQL(ThreadedDatabase):
 
     def normalize_number(self, value: str, coltype: FractionalType) -> str:
         return self.to_string(f"{value}::decimal(38, {coltype.precision})")
+
+    def regexp_match(self, value: str, pattern: str) -> str:
+        return f"{value} ~ '{pattern}'"
@@ -11,6 +11,10 @@ from .base import (
 )
 
 
+_SELECT_RE = re.compile(r"select", re.IGNORECASE)
+_MODIFY_RE = re.compile(r"(insert|create|truncate|drop)", re.IGNORECASE)
+
+
 @import_helper("presto")
 def import_presto():
     import prestodb
@@ -36,6 +40,8 @@ class Presto(Database):
     ROUNDS_ON_PREC_LOSS = True
 
     def __init__(self, host, port, user, password, *, catalog, schema=None, **kw):
+        super().__init__()
+
         prestodb = import_presto()
         self.args = dict(host=host, user=user, catalog=catalog, schema=schema, **kw)
 
@@ -54,13 +60,15 @@ class Presto(Database):
         "Uses the standard SQL cursor interface"
         c = self._conn.cursor()
         c.execute(sql_code)
-        if sql_code.lower().startswith("select"):
+        # The Presto client only knows the description after fetching, so we look at the statement instead
+        if _SELECT_RE.match(sql_code):
             return c.fetchall()
         # Required for the query to actually run 🤯
-        if re.match(r"(insert|create|truncate|drop)", sql_code, re.IGNORECASE):
+        if _MODIFY_RE.match(sql_code):
             return c.fetchone()
 
     def close(self):
+        super().close()
         self._conn.close()
 
     def normalize_timestamp(self, value: str, coltype: TemporalType) -> str:
@@ -75,12 +83,13 @@ class Presto(Database):
     def normalize_number(self, value: str, coltype: FractionalType) -> str:
         return self.to_string(f"cast({value} as decimal(38,{coltype.precision}))")
 
-    def select_table_schema(self, path: DbPath) -> str:
+    def select_table_schema(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None) -> str:
         schema, table = self._normalize_table_path(path)
 
         return (
             f"SELECT column_name, data_type, 3 as datetime_precision, 3 as numeric_precision FROM INFORMATION_SCHEMA.COLUMNS "
             f"WHERE table_name = '{table}' AND table_schema = '{schema}'"
+            + self._filter_columns_sql("column_name", filter_columns)
         )
 
     def _parse_type(
@@ -122,3 +131,6 @@ class Presto(Database):
     def normalize_uuid(self, value: str, coltype: ColType_UUID) -> str:
         # Trim doesn't work on CHAR type
         return f"TRIM(CAST({value} AS VARCHAR))"
+
+    def regexp_match(self, value: str, pattern: str) -> str:
+        return f"regexp_like({value}, '{pattern}')"
@@ -8,6 +8,8 @@ class Redshift(PostgreSQL):
         "double": Float,
         "real": Float,
     }
+    # Redshift materializes cursor results on the leader node, which is slower than a plain fetch
+    SUPPORTS_SERVER_SIDE_CURSORS = False
 
     def md5_to_int(self, s: str) -> str:
         return f"strtol(substring(md5({s}), {1+MD5_HEXDIGITS-CHECKSUM_HEXDIGITS}), 16)::decimal(38)"
@@ -35,10 +37,11 @@ class Redshift(PostgreSQL):
     def normalize_number(self, value: str, coltype: FractionalType) -> str:
         return self.to_string(f"{value}::decimal(38,{coltype.precision})")
 
-    def select_table_schema(self, path: DbPath) -> str:
+    def select_table_schema(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None) -> str:
         schema, table = self._normalize_table_path(path)
 
         return (
             "SELECT column_name, data_type, datetime_precision, numeric_precision, numeric_scale FROM information_schema.columns "
             f"WHERE table_name = '{table.lower()}' AND table_schema = '{schema.lower()}'"
+            + self._filter_columns_sql("column_name", filter_columns)
         )
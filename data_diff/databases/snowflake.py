@@ -1,7 +1,7 @@
 import logging
 
 from .database_types import *
-from .base import Database, import_helper, _query_conn, CHECKSUM_MASK
+from .base import Database, import_helper, _query_conn, CHECKSUM_MASK, logger
 
 
 @import_helper("snowflake")
@@ -38,6 +38,8 @@ class Snowflake(Database):
         role: str = None,
         **kw,
     ):
+        super().__init__()
+
         snowflake = import_snowflake()
         logging.getLogger("snowflake.connector").setLevel(logging.WARNING)
 
@@ -61,12 +63,20 @@ class Snowflake(Database):
         self.default_schema = schema
 
     def close(self):
+        super().close()
         self._conn.close()
 
     def _query(self, sql_code: str) -> list:
         "Uses the standard SQL cursor interface"
         return _query_conn(self._conn, sql_code)
 
+    def _query_multi(self, sql_codes: Sequence[str]) -> list:
+        "Sends all the queries in a single request, using execute_string()"
+        logger.debug("Running SQL (%s): %s", type(self).__name__, "; ".join(sql_codes))
+        cursors = self._conn.execute_string(";\n".join(sql_codes))
+        assert len(cursors) == len(sql_codes)
+        return [c.fetchall() if c.description is not None else None for c in cursors]
+
     def quote(self, s: str):
         return f'"{s}"'
 
@@ -76,9 +86,9 @@ class Snowflake(Database):
     def to_string(self, s: str):
         return f"cast({s} as string)"
 
-    def select_table_schema(self, path: DbPath) -> str:
+    def select_table_schema(self, path: DbPath, filter_columns: Optional[Sequence[str]] = None) -> str:
         schema, table = self._normalize_table_path(path)
-        return super().select_table_schema((schema, table))
+        return super().select_table_schema((schema, table), filter_columns)
 
     def normalize_timestamp(self, value: str, coltype: TemporalType) -> str:
         if coltype.rounds:
@@ -90,3 +100,6 @@ class Snowflake(Database):
 
     def normalize_number(self, value: str, coltype: FractionalType) -> str:
         return self.to_string(f"cast({value} as decimal(38, {coltype.precision}))")
+
+    def regexp_match(self, value: str, pattern: str) -> str:
+        return f"REGEXP_LIKE({value}, '{pattern}')"
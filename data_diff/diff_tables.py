@@ -4,20 +4,22 @@
 from abc import ABC, abstractmethod
 import time
 import os
+import math
 from numbers import Number
-from operator import attrgetter, methodcaller
+from operator import attrgetter, itemgetter, methodcaller
 from collections import defaultdict
-from typing import List, Tuple, Iterator, Optional
+from typing import Dict, List, Tuple, Iterator, Optional
 import logging
 from concurrent.futures import ThreadPoolExecutor
 
 from runtype import dataclass
 
-from .sql import Select, Checksum, Compare, DbPath, DbKey, DbTime, Count, TableName, Time, Min, Max, Value
+from .sql import Select, Checksum, Compare, DbPath, DbKey, DbTime, Count, TableName, Time, Min, Max, Value, Param
 from .utils import safezip, split_space
-from .databases.base import Database
+from .databases.base import Database, CHECKSUM_MASK
 from .databases.database_types import (
     ArithUUID,
+    ColType,
     NumericType,
     PrecisionType,
     StringType,
@@ -33,9 +35,10 @@ RECOMMENDED_CHECKSUM_DURATION = 10
 BENCHMARK = os.environ.get("BENCHMARK", False)
 DEFAULT_BISECTION_THRESHOLD = 1024 * 16
 DEFAULT_BISECTION_FACTOR = 32
+AUTO_BISECTION_SEGMENT_SIZE = 50_000
 
 
-@dataclass(frozen=False)
+@dataclass(slots=True)
 class TableSegment:
     """Signifies a segment of rows (and selected columns) within a table
 
@@ -107,6 +110,10 @@ class TableSegment:
             return self
 
         schema = self.database.query_table_schema(self.table_path, self._relevant_columns)
+        return self._with_queried_schema(schema)
+
+    def _with_queried_schema(self, schema: Dict[str, ColType]) -> "TableSegment":
+        "Returns a new instance with the given schema, as returned by Database.query_table_schema()"
         logger.debug(f"[{self.database.name}] Schema = {schema}")
 
         schema_inst: Schema
@@ -122,11 +129,14 @@ class TableSegment:
 
         return self.new(_schema=schema_inst)
 
-    def _make_key_range(self):
+    def _make_key_range(self, params=False):
+        "When params is True, the key bounds are left as Param placeholders named 'min_key' and 'max_key'"
         if self.min_key is not None:
-            yield Compare("<=", Value(self.min_key), self._quote_column(self.key_column))
+            min_key = Param("min_key") if params else Value(self.min_key)
+            yield Compare("<=", min_key, self._quote_column(self.key_column))
         if self.max_key is not None:
-            yield Compare("<", self._quote_column(self.key_column), Value(self.max_key))
+            max_key = Param("max_key") if params else Value(self.max_key)
+            yield Compare("<", self._quote_column(self.key_column), max_key)
 
     def _make_update_range(self):
         if self.min_update is not None:
@@ -134,15 +144,20 @@ class TableSegment:
         if self.max_update is not None:
             yield Compare("<", self._update_column, Time(self.max_update))
 
-    def _make_select(self, *, table=None, columns=None, where=None, group_by=None, order_by=None):
+    def _make_select(self, *, table=None, columns=None, where=None, group_by=None, order_by=None, key_params=False):
+        # Uses tuples, so the resulting Select is hashable (see Database.query_template)
         if columns is None:
-            columns = [self._normalize_column(self.key_column)]
-        where = list(self._make_key_range()) + list(self._make_update_range()) + ([] if where is None else [where])
-        order_by = None if order_by is None else [order_by]
+            columns = (self._normalize_column(self.key_column),)
+        where = (
+            tuple(self._make_key_range(key_params))
+            + tuple(self._make_update_range())
+            + (() if where is None else (where,))
+        )
+        order_by = None if order_by is None else (order_by,)
         return Select(
             table=table or TableName(self.table_path),
             where=where,
-            columns=columns,
+            columns=tuple(columns),
             group_by=group_by,
             order_by=order_by,
         )
@@ -195,15 +210,17 @@ class TableSegment:
     def _relevant_columns_repr(self) -> List[str]:
         return [self._normalize_column(c) for c in self._relevant_columns]
 
-    def count(self) -> Tuple[int, int]:
-        """Count how many rows are in the segment, in one pass."""
+    def count(self) -> int:
+        """Count how many rows are in the segment. Cheaper than count_and_checksum()."""
         return self.database.query(self._make_select(columns=[Count()]), int)
 
     def count_and_checksum(self) -> Tuple[int, int]:
         """Count and checksum the rows in the segment, in one pass."""
         start = time.time()
-        count, checksum = self.database.query(
-            self._make_select(columns=[Count(), Checksum(self._relevant_columns_repr)]), tuple
+        # Segments of the same table only differ in their key range, so they can share the compiled SQL
+        select = self._make_select(columns=[Count(), Checksum(tuple(self._relevant_columns_repr))], key_params=True)
+        count, checksum = self.database.query_template(
+            select, tuple, min_key=Value(self.min_key), max_key=Value(self.max_key)
         )
         duration = time.time() - start
         if duration > RECOMMENDED_CHECKSUM_DURATION:
@@ -212,7 +229,8 @@ class TableSegment:
                 "We recommend increasing --bisection-factor or decreasing --threads."
             )
 
-        return count or 0, checksum if checksum is None else int(checksum)
+        # Fold the sum into CHECKSUM_MASK, so checksums stay fixed-width no matter how many rows were summed
+        return count or 0, checksum if checksum is None else int(checksum) & CHECKSUM_MASK
 
     def query_key_range(self) -> Tuple[int, int]:
         """Query database for minimum and maximum key. This is used for setting the initial bounds."""
@@ -246,7 +264,7 @@ def diff_sets(a: set, b: set) -> Iterator:
     for i in s2 - s1:
         d[i[0]].append(("+", i))
 
-    for k, v in sorted(d.items(), key=lambda i: i[0]):
+    for _, v in sorted(d.items(), key=itemgetter(0)):
         yield from v
 
 
@@ -268,12 +286,15 @@ class TableDiffer:
         threaded (bool): Enable/disable threaded diffing. Needed to take advantage of database threads.
         max_threadpool_size (int): Maximum size of each threadpool. ``None`` means auto. Only relevant when `threaded` is ``True``.
                                    There may be many pools, so number of actual threads can be a lot higher.
+        auto_bisection (bool): Choose the bisection factor from the size of the key range.
+                               When ``True``, `bisection_factor` is ignored.
     """
 
     bisection_factor: int = DEFAULT_BISECTION_FACTOR
     bisection_threshold: Number = DEFAULT_BISECTION_THRESHOLD       # Accepts inf for tests
     threaded: bool = True
     max_threadpool_size: Optional[int] = 1
+    auto_bisection: bool = False
 
     # Enable/disable debug prints
     debug: bool = False
@@ -293,12 +314,10 @@ class TableDiffer:
             ('-', columns) for items in table2 but not in table1
             Where `columns` is a tuple of values for the involved columns, i.e. (id, ...extra)
         """
-        if self.bisection_factor >= self.bisection_threshold:
-            raise ValueError("Incorrect param values (bisection factor must be lower than threshold)")
-        if self.bisection_factor < 2:
-            raise ValueError("Must have at least two segments per iteration (i.e. bisection_factor >= 2)")
+        if not self.auto_bisection:
+            self._validate_bisection_factor(self.bisection_factor)
 
-        table1, table2 = self._threaded_call("with_schema", [table1, table2])
+        table1, table2 = self._with_schemas(table1, table2)
         self._validate_and_adjust_columns(table1, table2)
 
         key_ranges = self._threaded_call("query_key_range", [table1, table2])
@@ -318,13 +337,39 @@ class TableDiffer:
         table1 = table1.new(min_key=min_key, max_key=max_key)
         table2 = table2.new(min_key=min_key, max_key=max_key)
 
+        differ = self
+        if self.auto_bisection:
+            # The size of the key range is an upper bound for the row count, and costs no extra query.
+            # The factor is derived, so it's clamped to stay below the threshold rather than rejected.
+            segment_count = math.ceil((max_key - min_key) / AUTO_BISECTION_SEGMENT_SIZE)
+            bisection_factor = max(2, int(min(DEFAULT_BISECTION_FACTOR, self.bisection_threshold - 1, segment_count)))
+            self._validate_bisection_factor(bisection_factor)  # Only fails when the threshold itself is too low
+            differ = self.replace(bisection_factor=bisection_factor)  # Shares the stats dict
+
         logger.info(
-            f"Diffing tables | segments: {self.bisection_factor}, bisection threshold: {self.bisection_threshold}. "
+            f"Diffing tables | segments: {differ.bisection_factor}, bisection threshold: {self.bisection_threshold}. "
             f"key-range: {table1.min_key}..{table2.max_key}, "
             f"size: {table2.max_key-table1.min_key}"
         )
 
-        return self._bisect_and_diff_tables(table1, table2)
+        return differ._bisect_and_diff_tables(table1, table2)
+
+    def _validate_bisection_factor(self, bisection_factor):
+        if bisection_factor >= self.bisection_threshold:
+            raise ValueError("Incorrect param values (bisection factor must be lower than threshold)")
+        if bisection_factor < 2:
+            raise ValueError("Must have at least two segments per iteration (i.e. bisection_factor >= 2)")
+
+    def _with_schemas(self, table1, table2):
+        "Like with_schema() for both tables. When they share a database, their schemas are queried in one batch."
+        database = table1.database
+        if database is not table2.database or table1._schema or table2._schema:
+            return self._threaded_call("with_schema", [table1, table2])
+
+        schema1, schema2 = database.query_table_schemas(
+            [table1.table_path, table2.table_path], [table1._relevant_columns, table2._relevant_columns]
+        )
+        return table1._with_queried_schema(schema1), table2._with_queried_schema(schema2)
 
     def _validate_and_adjust_columns(self, table1, table2):
         for c in table1._relevant_columns:
@@ -453,7 +498,16 @@ class TableDiffer:
             return map(func, iter)
 
         task_pool = ThreadPoolExecutor(max_workers=self.max_threadpool_size)
-        return task_pool.map(func, iter)
+        try:
+            return task_pool.map(func, iter)
+        finally:
+            # map() submits everything upfront, so the tasks still run. This only lets the idle workers exit.
+            task_pool.shutdown(wait=False)
 
     def _threaded_call(self, func, iter):
-        return list(self._thread_map(methodcaller(func), iter))
+        objs = list(iter)
+        if len(objs) == 2 and objs[0] == objs[1]:
+            # Same segment on both sides (e.g. diffing a table against itself). Query it only once.
+            res = methodcaller(func)(objs[0])
+            return [res, res]
+        return list(self._thread_map(methodcaller(func), objs))
@@ -15,6 +15,9 @@ class Sql:
 
 SqlOrStr = Union[Sql, str]
 
+# Delimits Param placeholders in compiled templates. Can't appear in valid SQL.
+_PARAM_MARK = "\0"
+
 
 @dataclass
 class Compiler:
@@ -38,6 +41,29 @@ class Compiler:
             return str(elem)
         assert False
 
+    def compile_template(self, elem) -> "SqlTemplate":
+        "Compile the given element, leaving its Param placeholders to be bound later"
+        return SqlTemplate(self, self.compile(elem).split(_PARAM_MARK))
+
+
+class SqlTemplate:
+    """Compiled SQL with unbound parameters. Created by Compiler.compile_template()
+
+    For internal use.
+    """
+
+    def __init__(self, compiler: Compiler, parts: List[str]):
+        # Even indices hold SQL code, odd indices hold parameter names
+        self.compiler = compiler
+        self.parts = parts
+
+    def bind(self, **params: SqlOrStr) -> str:
+        "Return the SQL code, with each Param replaced by the compiled value of the same name"
+        parts = list(self.parts)
+        for i in range(1, len(parts), 2):
+            parts[i] = self.compiler.compile(params[parts[i]])
+        return "".join(parts)
+
 
 @dataclass
 class TableName(Sql):
@@ -185,6 +211,19 @@ class Time(Sql):
         return "'%s'" % self.time.isoformat()
 
 
+@dataclass
+class Param(Sql):
+    """A placeholder for a value that is bound after compilation, using SqlTemplate.bind()
+
+    Lets the same compiled template be reused for queries that only differ in their values.
+    """
+
+    name: str
+
+    def compile(self, c: Compiler):
+        return f"{_PARAM_MARK}{self.name}{_PARAM_MARK}"
+
+
 @dataclass
 class Explain(Sql):
     sql: Select
@@ -1,4 +1,5 @@
 import math
+import re
 
 from typing import Sequence, Optional, Tuple, Union, Dict, Any
 from uuid import UUID
@@ -34,12 +35,15 @@ class ArithUUID(UUID):
         return self.int
 
 
+# Hex UUID, with or without dashes
+UUID_PATTERN = "[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}"
+# Also accepts the wrappers that UUID() strips: an "urn:uuid:" prefix and surrounding braces
+_UUID_RE = re.compile(r"(?:urn:)?(?:uuid:)?\{*" + UUID_PATTERN + r"\}*")
+
+
 def is_uuid(u):
-    try:
-        UUID(u)
-    except ValueError:
-        return False
-    return True
+    # Checking the length first skips the regexp for most non-uuid values
+    return len(u) >= 32 and _UUID_RE.fullmatch(u) is not None
 
 
 def number_to_human(n):
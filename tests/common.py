@@ -4,6 +4,7 @@ import string
 import random
 
 from data_diff import databases as db
+from data_diff.databases.base import CHECKSUM_MASK
 import logging
 import subprocess
 
@@ -19,6 +20,8 @@ DEFAULT_N_SAMPLES = 50
 N_SAMPLES = int(os.environ.get("N_SAMPLES", DEFAULT_N_SAMPLES))
 BENCHMARK = os.environ.get("BENCHMARK", False)
 N_THREADS = int(os.environ.get("N_THREADS", 1))
+# Share the populated source tables between tests (dropped at exit)
+CACHE_TABLES = os.environ.get("DATA_DIFF_CACHE_TABLES", False)
 
 
 def get_git_revision_short_hash() -> str:
@@ -75,9 +78,7 @@ def str_to_checksum(str: str):
     #   => 5eb63bbbe01eeed093cb22bb8f5acdc3
     #   =>                   cb22bb8f5acdc3
     #   => 273350391345368515
-    m = hashlib.md5()
-    m.update(str.encode("utf-8"))  # encode to binary
-    md5 = m.hexdigest()
-    # 0-indexed, unlike DBs which are 1-indexed here, so +1 in dbs
-    half_pos = db.MD5_HEXDIGITS - db.CHECKSUM_HEXDIGITS
-    return int(md5[half_pos:], 16)
+    # Same as taking the last CHECKSUM_HEXDIGITS of the hexdigest, like the dbs do,
+    # but without the round trip through a hex string
+    md5 = hashlib.md5(str.encode("utf-8")).digest()
+    return int.from_bytes(md5[-8:], "big") & CHECKSUM_MASK
@@ -1,7 +1,8 @@
 import unittest
 
-from .common import str_to_checksum, TEST_MYSQL_CONN_STRING
+from .common import str_to_checksum, random_table_suffix, TEST_MYSQL_CONN_STRING
 from data_diff.databases import connect_to_uri
+from data_diff.databases.database_types import ColType_UUID, Text
 
 
 class TestDatabase(unittest.TestCase):
@@ -11,6 +12,9 @@ class TestDatabase(unittest.TestCase):
     def test_connect_to_db(self):
         self.assertEqual(1, self.mysql.query("SELECT 1", int))
 
+    def test_query_many(self):
+        self.assertEqual([1, 2], self.mysql.query_many(["SELECT 1", "SELECT 2"], int))
+
     def test_md5_to_int(self):
         str = "hello world"
         query_fragment = self.mysql.md5_to_int("'{0}'".format(str))
@@ -18,6 +22,48 @@ class TestDatabase(unittest.TestCase):
 
         self.assertEqual(str_to_checksum(str), self.mysql.query(query, int))
 
+    def test_query_table_schema_cached(self):
+        table = f"schema_cache{random_table_suffix()}"
+        self.mysql.query(f"CREATE TABLE {table}(id int, comment varchar(100))", None)
+        try:
+            schema = self.mysql.query_table_schema((table,))
+            self.assertEqual({"id", "comment"}, set(schema))
+            schema["id"] = None  # Modifying the result must not affect the cache
+
+            self.mysql.query(f"ALTER TABLE {table} ADD COLUMN extra int", None)
+            schema = self.mysql.query_table_schema((table,))
+            self.assertEqual({"id", "comment"}, set(schema))
+            self.assertIsNotNone(schema["id"])
+
+            self.mysql.invalidate_schema((table,))
+            self.assertEqual({"id", "comment", "extra"}, set(self.mysql.query_table_schema((table,))))
+        finally:
+            self.mysql.query(f"DROP TABLE {table}", None)
+
+        self.mysql.invalidate_schema((table,))
+        self.assertRaises(RuntimeError, self.mysql.query_table_schema, (table,))
+
+    def test_filter_columns_sql(self):
+        self.assertEqual("", self.mysql._filter_columns_sql("name", None))
+        self.assertEqual(" AND 1 = 0", self.mysql._filter_columns_sql("name", []))
+        self.assertEqual(" AND LOWER(name) IN ('id')", self.mysql._filter_columns_sql("name", ["Id"]))
+
+    def test_query_table_schemas_detects_uuids(self):
+        tables = [f"schema_uuid{random_table_suffix()}" for _ in range(2)]
+        for table, value in zip(tables, ["'5a7d7ea4-6c55-4b5c-a1a6-9b6c8ddc9e33'", "'hello'"]):
+            self.mysql.query(f"CREATE TABLE {table}(id int, comment varchar(100))", None)
+            # Same connection for the insert and its commit
+            self.mysql.query_many([f"INSERT INTO {table} VALUES (1, {value})", "COMMIT"], None)
+        try:
+            uuid_schema, text_schema = self.mysql.query_table_schemas([(t,) for t in tables])
+        finally:
+            for table in tables:
+                self.mysql.query(f"DROP TABLE {table}", None)
+
+        self.assertIsInstance(uuid_schema["comment"], ColType_UUID)
+        self.assertIsInstance(text_schema["comment"], Text)
+        self.assertNotIsInstance(text_schema["comment"], ColType_UUID)
+
 
 class TestConnect(unittest.TestCase):
     def test_bad_uris(self):
@@ -2,57 +2,110 @@ from contextlib import suppress
 import unittest
 import time
 import json
+import atexit
+import queue
+import threading
 import re
 import rich.progress
 import math
 import uuid
+from itertools import accumulate, chain, islice, product, repeat
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
 from datetime import datetime, timedelta, timezone
 import logging
 from decimal import Decimal
 from parameterized import parameterized
+import dsnparse
 
 from data_diff import databases as db
+from data_diff.databases.connect import MATCH_URI_PATH
 from data_diff.utils import number_to_human
 from data_diff.diff_tables import TableDiffer, TableSegment, DEFAULT_BISECTION_THRESHOLD
-from .common import CONN_STRINGS, N_SAMPLES, N_THREADS, BENCHMARK, GIT_REVISION, random_table_suffix
+from .common import CONN_STRINGS, N_SAMPLES, N_THREADS, BENCHMARK, CACHE_TABLES, GIT_REVISION, random_table_suffix
 
 
-CONNS = {k: db.connect_to_uri(v, N_THREADS) for k, v in CONN_STRINGS.items()}
+class _UTCMySQL(db.MySQL):
+    def create_connection(self):
+        # Any pooled connection may run a query, so each one needs the session time zone
+        conn = super().create_connection()
+        conn.time_zone = "+00:00"
+        return conn
 
-CONNS[db.MySQL].query("SET @@session.time_zone='+00:00'", None)
+
+def _connect(db_cls, uri):
+    # Each database is a pool of up to N_THREADS connections, opened lazily on first use
+    if db_cls is db.MySQL:
+        dsn = dsnparse.parse(uri)
+        kw = MATCH_URI_PATH["mysql"].match_path(dsn)
+        return _UTCMySQL(dsn.host, dsn.port, dsn.user, dsn.password, thread_count=N_THREADS, **kw)
+    return db.connect_to_uri(uri, N_THREADS)
+
+
+def _connect_all(conn_strings):
+    "Connect to all the databases concurrently, skipping (with a warning) the ones that fail"
+    # Some databases (e.g. Snowflake, BigQuery) connect on creation
+    with ThreadPoolExecutor(max_workers=max(len(conn_strings), 1)) as pool:
+        futures = {db_cls: pool.submit(_connect, db_cls, uri) for db_cls, uri in conn_strings.items()}
+
+    conns = {}
+    for db_cls, future in futures.items():
+        try:
+            conns[db_cls] = future.result()
+        except Exception as e:
+            logging.warning(f"Failed to connect to {db_cls.__name__}, skipping its tests: {e}")
+    return conns
+
+
+CONNS = _connect_all(CONN_STRINGS)
 
 
 class PaginatedTable:
     # We can't query all the rows at once for large tables. It'll occupy too
     # much memory.
+    # We paginate by key, instead of holding a streaming cursor open, because
+    # the rows are usually inserted into another table while we iterate, possibly
+    # through the same connection pool.
     RECORDS_PER_BATCH = 1000000
 
-    def __init__(self, table, conn):
+    def __init__(self, table, conn, convert_col=None):
         self.table = table
         self.conn = conn
+        self.convert_col = convert_col  # Optionally applied to 'col', a batch at a time
 
     def __iter__(self):
-        iter = PaginatedTable(self.table, self.conn)
-        iter.last_id = 0
-        iter.values = []
-        iter.value_index = 0
-        return iter
-
-    def __next__(self) -> str:
-        if self.value_index == len(self.values):  #  end of current batch
-            query = f"SELECT id, col FROM {self.table} WHERE id > {self.last_id} ORDER BY id ASC LIMIT {self.RECORDS_PER_BATCH}"
+        last_id = 0
+        while True:
+            query = f"SELECT id, col FROM {self.table} WHERE id > {last_id} ORDER BY id ASC LIMIT {self.RECORDS_PER_BATCH}"
             if isinstance(self.conn, db.Oracle):
-                query = f"SELECT id, col FROM {self.table} WHERE id > {self.last_id} ORDER BY id ASC OFFSET 0 ROWS FETCH NEXT {self.RECORDS_PER_BATCH} ROWS ONLY"
+                query = f"SELECT id, col FROM {self.table} WHERE id > {last_id} ORDER BY id ASC OFFSET 0 ROWS FETCH NEXT {self.RECORDS_PER_BATCH} ROWS ONLY"
+
+            # List[Tuple] lets databases with server-side cursors fetch the batch incrementally
+            values = self.conn.query(query, List[Tuple])
+            if self.convert_col is not None:
+                convert_col = self.convert_col
+                values = [(id, convert_col(col)) for id, col in values]
+            yield from values
+            if len(values) < self.RECORDS_PER_BATCH:  #  we must be done!
+                return
+            last_id = values[-1][0]
+
+
+def _timed(func):
+    "Call func(), and return its result along with the time it took"
+    start = time.time()
+    res = func()
+    return res, time.time() - start
+
+
+def _parse_presto_timestamp(s: str) -> datetime:
+    return datetime.fromisoformat(s.rstrip(" UTC"))
 
-            self.values = self.conn.query(query, list)
-            if len(self.values) == 0:  #  we must be done!
-                raise StopIteration
-            self.last_id = self.values[-1][0]
-            self.value_index = 0
 
-        this_value = self.values[self.value_index]
-        self.value_index += 1
-        return this_value
+def _steps(start, step, count):
+    "Yields start+step, start+2*step, ... ('count' values), accumulating like repeated +="
+    return islice(accumulate(chain([start], repeat(step, max(count, 0)))), 1, None)
 
 
 class DateTimeFaker:
@@ -69,26 +122,13 @@ class DateTimeFaker:
         self.max = max
 
     def __iter__(self):
-        iter = DateTimeFaker(self.max)
-        iter.prev = datetime(2000, 1, 1, 0, 0, 0, 0)
-        iter.i = 0
-        return iter
+        yield from self.MANUAL_FAKES
+        start = datetime(2000, 1, 1, 0, 0, 0, 0)
+        yield from _steps(start, timedelta(seconds=3, microseconds=571), self.max - len(self.MANUAL_FAKES))
 
     def __len__(self):
         return self.max
 
-    def __next__(self) -> datetime:
-        if self.i < len(self.MANUAL_FAKES):
-            fake = self.MANUAL_FAKES[self.i]
-            self.i += 1
-            return fake
-        elif self.i < self.max:
-            self.prev = self.prev + timedelta(seconds=3, microseconds=571)
-            self.i += 1
-            return self.prev
-        else:
-            raise StopIteration
-
 
 class IntFaker:
     MANUAL_FAKES = [127, -3, -9, 37, 15, 127]
@@ -97,26 +137,12 @@ class IntFaker:
         self.max = max
 
     def __iter__(self):
-        iter = IntFaker(self.max)
-        iter.prev = -128
-        iter.i = 0
-        return iter
+        yield from self.MANUAL_FAKES
+        yield from range(-127, -127 + max(self.max - len(self.MANUAL_FAKES), 0))
 
     def __len__(self):
         return self.max
 
-    def __next__(self) -> int:
-        if self.i < len(self.MANUAL_FAKES):
-            fake = self.MANUAL_FAKES[self.i]
-            self.i += 1
-            return fake
-        elif self.i < self.max:
-            self.prev += 1
-            self.i += 1
-            return self.prev
-        else:
-            raise StopIteration
-
 
 class FloatFaker:
     MANUAL_FAKES = [
@@ -142,26 +168,12 @@ class FloatFaker:
         self.max = max
 
     def __iter__(self):
-        iter = FloatFaker(self.max)
-        iter.prev = -10.0001
-        iter.i = 0
-        return iter
+        yield from self.MANUAL_FAKES
+        yield from _steps(-10.0001, 0.00571, self.max - len(self.MANUAL_FAKES))
 
     def __len__(self):
         return self.max
 
-    def __next__(self) -> float:
-        if self.i < len(self.MANUAL_FAKES):
-            fake = self.MANUAL_FAKES[self.i]
-            self.i += 1
-            return fake
-        elif self.i < self.max:
-            self.prev += 0.00571
-            self.i += 1
-            return self.prev
-        else:
-            raise StopIteration
-
 
 class UUID_Faker:
     def __init__(self, max):
@@ -171,7 +183,10 @@ class UUID_Faker:
         return self.max
 
     def __iter__(self):
-        return (uuid.uuid1(i) for i in range(self.max))
+        # Equivalent to uuid1(node=i) with a fixed timestamp, without reading the clock for every value.
+        # (the node is the lowest 48 bits, so it doesn't affect the version and variant bits)
+        base = uuid.uuid1(0).int
+        return (uuid.UUID(int=base + i) for i in range(self.max))
 
 
 TYPE_SAMPLES = {
@@ -351,37 +366,34 @@ DATABASE_TYPES = {
 }
 
 
-type_pairs = []
-for source_db, source_type_categories in DATABASE_TYPES.items():
-    for target_db, target_type_categories in DATABASE_TYPES.items():
-        for (
-            type_category,
-            source_types,
-        ) in source_type_categories.items():  # int, datetime, ..
-            for source_type in source_types:
-                for target_type in target_type_categories[type_category]:
-                    if CONNS.get(source_db, False) and CONNS.get(target_db, False):
-                        type_pairs.append(
-                            (
-                                source_db,
-                                target_db,
-                                source_type,
-                                target_type,
-                                type_category,
-                            )
-                        )
+# Only databases we can connect to, before building the cross-product
+available_dbs = [d for d in DATABASE_TYPES if d in CONNS]
+type_pairs = [
+    (source_db, target_db, source_type, target_type, type_category)
+    for source_db, target_db in product(available_dbs, available_dbs)
+    for type_category, source_types in DATABASE_TYPES[source_db].items()  # int, datetime, ..
+    for source_type in source_types
+    for target_type in DATABASE_TYPES[target_db][type_category]
+]
 
 
-def sanitize(name):
-    name = name.lower()
-    name = re.sub(r"[\(\)]", "", name)  #  timestamp(9) -> timestamp9
+_SANITIZE_REPLACEMENTS = {
+    "(": "",  #  timestamp(9) -> timestamp9
+    ")": "",
     # Try to shorten long fields, due to length limitations in some DBs
-    name = name.replace(r"without time zone", "n_tz")
-    name = name.replace(r"with time zone", "y_tz")
-    name = name.replace(r"with local time zone", "y_tz")
-    name = name.replace(r"timestamp", "ts")
-    name = name.replace(r"double precision", "double")
-    name = name.replace(r"numeric", "num")
+    "without time zone": "n_tz",
+    "with time zone": "y_tz",
+    "with local time zone": "y_tz",
+    "timestamp": "ts",
+    "double precision": "double",
+    "numeric": "num",
+}
+_SANITIZE_RE = re.compile("|".join(map(re.escape, _SANITIZE_REPLACEMENTS)))
+
+
+@lru_cache(maxsize=None)
+def sanitize(name):
+    name = _SANITIZE_RE.sub(lambda m: _SANITIZE_REPLACEMENTS[m.group()], name.lower())
     return parameterized.to_safe_name(name)
 
 
@@ -403,12 +415,67 @@ def expand_params(testcase_func, param_num, param):
     return name
 
 
+_TZ_TYPE_RE = re.compile(r"(time zone|tz)")
+
+
+def _value_formatter(conn):
+    "Returns a function that formats a sample as an SQL literal for 'conn'. The format is chosen once per Python type."
+    timestamp_literals = isinstance(conn, (db.Presto, db.Oracle))
+    formatters = {}
+
+    def format_value(sample):
+        cls = type(sample)
+        fmt = formatters.get(cls)
+        if fmt is None:
+            if isinstance(sample, (float, Decimal, int)):
+                fmt = str
+            elif isinstance(sample, datetime) and timestamp_literals:
+                fmt = "timestamp '{}'".format
+            elif isinstance(sample, bytearray):
+                fmt = lambda s: f"'{s.decode()}'"
+            else:
+                fmt = "'{}'".format
+            formatters[cls] = fmt
+        return fmt(sample)
+
+    return format_value
+
+
+def _batched_producer(items, batch_size=8000):
+    """Iterate over 'items' in a background thread, handing them over in batches.
+
+    Lets producing the values (generating samples, or reading the source table) overlap with inserting them.
+    """
+    items = iter(items)
+    batches = queue.Queue(maxsize=4)
+
+    def produce():
+        try:
+            for batch in iter(lambda: list(islice(items, batch_size)), []):
+                batches.put(batch)
+        except BaseException as e:
+            batches.put(e)
+        else:
+            batches.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        batch = batches.get()
+        if batch is None:
+            return
+        if isinstance(batch, BaseException):
+            raise batch
+        yield from batch
+
+
 def _insert_to_table(conn, table, values, type):
-    current_n_rows = conn.query(f"SELECT COUNT(*) FROM {table}", int)
-    if current_n_rows == N_SAMPLES:
+    # Rows are inserted in order of id, so MAX(id) tells whether a previous run inserted all of them.
+    # Unlike COUNT(*), it doesn't need to scan the table (it's answered from the index on id).
+    max_id = conn.query(f"SELECT MAX(id) FROM {table}", int)
+    if max_id == N_SAMPLES:
         assert BENCHMARK, "Table should've been deleted, or we should be in BENCHMARK mode"
         return
-    elif current_n_rows > 0:
+    elif max_id is not None:
         _drop_table_if_exists(conn, table)
         _create_table_with_indexes(conn, table, type)
 
@@ -416,66 +483,83 @@ def _insert_to_table(conn, table, values, type):
         description = f"{conn.name}: {table}"
         values = rich.progress.track(values, total=N_SAMPLES, description=description)
 
-    default_insertion_query = f"INSERT INTO {table} (id, col) VALUES "
-    if isinstance(conn, db.Oracle):
-        default_insertion_query = f"INSERT INTO {table} (id, col)"
-
     batch_size = 8000
     if isinstance(conn, db.BigQuery):
         batch_size = 1000
+    elif isinstance(conn, db.Oracle):
+        # INSERT ALL allows at most 999 target columns in total, i.e. 499 rows of (id, col)
+        batch_size = 499
+
+    needs_tz = _TZ_TYPE_RE.search(type) is not None
+    format_value = _value_formatter(conn)
 
-    insertion_query = default_insertion_query
-    selects = []
+    rows = []
     for j, sample in values:
-        if re.search(r"(time zone|tz)", type):
+        if needs_tz:
             sample = sample.replace(tzinfo=timezone.utc)
 
-        if isinstance(sample, (float, Decimal, int)):
-            value = str(sample)
-        elif isinstance(sample, datetime) and isinstance(conn, (db.Presto, db.Oracle)):
-            value = f"timestamp '{sample}'"
-        elif isinstance(sample, bytearray):
-            value = f"'{sample.decode()}'"
-        else:
-            value = f"'{sample}'"
-
-        if isinstance(conn, db.Oracle):
-            selects.append(f"SELECT {j}, {value} FROM dual")
-        else:
-            insertion_query += f"({j}, {value}),"
+        rows.append((j, format_value(sample)))
 
         # Some databases want small batch sizes...
         # Need to also insert on the last row, might not divide cleanly!
         if j % batch_size == 0 or j == N_SAMPLES:
-            if isinstance(conn, db.Oracle):
-                insertion_query += " UNION ALL ".join(selects)
-                conn.query(insertion_query, None)
-                selects = []
-            else:
-                conn.query(insertion_query[0:-1], None)
-                insertion_query = default_insertion_query
+            _insert_rows(conn, table, rows)
+            rows = []
 
     if not isinstance(conn, db.BigQuery):
         conn.query("COMMIT", None)
 
 
-def _create_indexes(conn, table):
+def _insert_rows(conn, table, rows):
+    "Insert a batch of (id, value_sql) rows, using a single statement"
+    if isinstance(conn, db.Oracle):
+        # Unlike a UNION ALL of selects from dual, these aren't planned as separate query blocks
+        intos = " ".join([f"INTO {table} (id, col) VALUES ({j}, {value})" for j, value in rows])
+        conn.query(f"INSERT ALL {intos} SELECT 1 FROM dual", None)
+    else:
+        values = ",".join([f"({j}, {value})" for j, value in rows])
+        conn.query(f"INSERT INTO {table} (id, col) VALUES {values}", None)
+
+
+def _index_statements(conn, table):
     # It is unfortunate that Presto doesn't support creating indexes...
     # Technically we could create it in the backing Postgres behind the scenes.
     if isinstance(conn, (db.Snowflake, db.Redshift, db.Presto, db.BigQuery)):
-        return
+        return []
+
+    if_not_exists = "IF NOT EXISTS" if not isinstance(conn, (db.MySQL, db.Oracle)) else ""
+    return [
+        f"CREATE INDEX {if_not_exists} xa_{table[1:-1]} ON {table} (id, col)",
+        f"CREATE INDEX {if_not_exists} xb_{table[1:-1]} ON {table} (id)",
+    ]
+
+
+def _run_statements(conn, statements):
+    "Run the statements in order, in a single round-trip if the database runs multi-statement requests in order"
+    if isinstance(conn, (db.MySQL, db.Snowflake)):
+        conn.query_many(statements, None)
+    else:
+        for statement in statements:
+            conn.query(statement, None)
+
+
+def _create_table_with_indexes(conn, table, type):
+    statements = []
+    if isinstance(conn, db.Oracle):
+        already_exists = conn.query(f"SELECT COUNT(*) from tab where tname='{table.upper()}'", int) > 0
+        if not already_exists:
+            statements.append(f"CREATE TABLE {table}(id int, col {type})")
+    else:
+        statements.append(f"CREATE TABLE IF NOT EXISTS {table}(id int, col {type})")
+
+    statements += _index_statements(conn, table)
+    if not isinstance(conn, db.BigQuery):
+        statements.append("COMMIT")
 
     try:
-        if_not_exists = "IF NOT EXISTS" if not isinstance(conn, (db.MySQL, db.Oracle)) else ""
-        conn.query(
-            f"CREATE INDEX {if_not_exists} xa_{table[1:-1]} ON {table} (id, col)",
-            None,
-        )
-        conn.query(
-            f"CREATE INDEX {if_not_exists} xb_{table[1:-1]} ON {table} (id)",
-            None,
-        )
+        _run_statements(conn, statements)
     except Exception as err:
+        # DDL commits implicitly in these databases, so the skipped COMMIT doesn't matter
         if "Duplicate key name" in str(err):  #  mysql
             pass
         elif "such column list already indexed" in str(err):  #  oracle
@@ -486,19 +570,6 @@ def _create_indexes(conn, table):
             raise (err)
 
 
-def _create_table_with_indexes(conn, table, type):
-    if isinstance(conn, db.Oracle):
-        already_exists = conn.query(f"SELECT COUNT(*) from tab where tname='{table.upper()}'", int) > 0
-        if not already_exists:
-            conn.query(f"CREATE TABLE {table}(id int, col {type})", None)
-    else:
-        conn.query(f"CREATE TABLE IF NOT EXISTS {table}(id int, col {type})", None)
-
-    _create_indexes(conn, table)
-    if not isinstance(conn, db.BigQuery):
-        conn.query("COMMIT", None)
-
-
 def _drop_table_if_exists(conn, table):
     with suppress(db.QueryError):
         if isinstance(conn, db.Oracle):
@@ -510,12 +581,32 @@ def _drop_table_if_exists(conn, table):
                 conn.query("COMMIT", None)
 
 
+@lru_cache(maxsize=None)
+def _benchmark_file():
+    "Opened once per run, on the first benchmark result"
+    file = open(f"benchmark_{GIT_REVISION}.jsonl", "a", encoding="utf-8")
+    atexit.register(file.close)
+    return file
+
+
+# Populated source tables, shared between tests when CACHE_TABLES is set. {(db_cls, type): (quoted_table, path)}
+_SOURCE_TABLES = {}
+
+
+def tearDownModule():
+    for (db_cls, _), (table, _) in _SOURCE_TABLES.items():
+        _drop_table_if_exists(CONNS[db_cls], table)
+    _SOURCE_TABLES.clear()
+
+
 class TestDiffCrossDatabaseTables(unittest.TestCase):
     maxDiff = 10000
+    shared_source = False
 
     def tearDown(self) -> None:
         if not BENCHMARK:
-            _drop_table_if_exists(self.src_conn, self.src_table)
+            if not self.shared_source:
+                _drop_table_if_exists(self.src_conn, self.src_table)
             _drop_table_if_exists(self.dst_conn, self.dst_table)
 
         return super().tearDown()
@@ -540,30 +631,44 @@ class TestDiffCrossDatabaseTables(unittest.TestCase):
         src_table_name = f"src_{self._testMethodName[11:]}{table_suffix}"
         dst_table_name = f"dst_{self._testMethodName[11:]}{table_suffix}"
 
+        # The source table only depends on the source database and type, so it may be shared between tests
+        source_key = source_db, source_type
+        self.shared_source = CACHE_TABLES and not BENCHMARK
+        if self.shared_source:
+            src_table_name = f"src_{sanitize(source_db.__name__)}_{sanitize(source_type)}{table_suffix}"
+
         src_table_path = src_conn.parse_table_name(src_table_name)
         dst_table_path = dst_conn.parse_table_name(dst_table_name)
         self.src_table = src_table = src_conn.quote(".".join(src_table_path))
         self.dst_table = dst_table = dst_table = dst_conn.quote(".".join(dst_table_path))
 
         start = time.time()
-        if not BENCHMARK:
-            _drop_table_if_exists(src_conn, src_table)
-        _create_table_with_indexes(src_conn, src_table, source_type)
-        _insert_to_table(src_conn, src_table, enumerate(sample_values, 1), source_type)
+        if self.shared_source and source_key in _SOURCE_TABLES:
+            src_table, src_table_path = _SOURCE_TABLES[source_key]
+            self.src_table = src_table
+        else:
+            if not BENCHMARK:
+                _drop_table_if_exists(src_conn, src_table)
+            _create_table_with_indexes(src_conn, src_table, source_type)
+            _insert_to_table(src_conn, src_table, _batched_producer(enumerate(sample_values, 1)), source_type)
+            if self.shared_source:
+                _SOURCE_TABLES[source_key] = src_table, src_table_path
         insertion_source_duration = time.time() - start
 
-        values_in_source = PaginatedTable(src_table, src_conn)
+        convert_col = None
         if source_db is db.Presto:
+            # The Presto client returns these types as strings, even when cast in the query
             if source_type.startswith("decimal"):
-                values_in_source = ((a, Decimal(b)) for a, b in values_in_source)
+                convert_col = Decimal
             elif source_type.startswith("timestamp"):
-                values_in_source = ((a, datetime.fromisoformat(b.rstrip(" UTC"))) for a, b in values_in_source)
+                convert_col = _parse_presto_timestamp
+        values_in_source = PaginatedTable(src_table, src_conn, convert_col)
 
         start = time.time()
         if not BENCHMARK:
             _drop_table_if_exists(dst_conn, dst_table)
         _create_table_with_indexes(dst_conn, dst_table, target_type)
-        _insert_to_table(dst_conn, dst_table, values_in_source, target_type)
+        _insert_to_table(dst_conn, dst_table, _batched_producer(values_in_source), target_type)
         insertion_target_duration = time.time() - start
 
         if type_category == "uuid":
@@ -573,13 +678,13 @@ class TestDiffCrossDatabaseTables(unittest.TestCase):
             self.table = TableSegment(self.src_conn, src_table_path, "id", None, ("col",), case_sensitive=False)
             self.table2 = TableSegment(self.dst_conn, dst_table_path, "id", None, ("col",), case_sensitive=False)
 
-        start = time.time()
-        self.assertEqual(N_SAMPLES, self.table.count())
-        count_source_duration = time.time() - start
-
-        start = time.time()
-        self.assertEqual(N_SAMPLES, self.table2.count())
-        count_target_duration = time.time() - start
+        # The two counts are independent, so their round-trips can overlap
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            (source_count, count_source_duration), (target_count, count_target_duration) = pool.map(
+                _timed, [self.table.count, self.table2.count]
+            )
+        self.assertEqual(N_SAMPLES, source_count)
+        self.assertEqual(N_SAMPLES, target_count)
 
         # When testing, we configure these to their lowest possible values for
         # the DEFAULT_N_SAMPLES.
@@ -606,6 +711,13 @@ class TestDiffCrossDatabaseTables(unittest.TestCase):
         # For benchmarking, to make it fair, we split into segments of a
         # reasonable amount of rows each. These will then be downloaded in
         # parallel, using the existing implementation.
+        #
+        # This can't be folded into the checksum run above: that run must prove
+        # that no rows are downloaded, and this one that all of them are. The
+        # download run doesn't checksum, and its schema queries are served from
+        # the database's schema cache, so the repeated work is only the key range.
+        # Nor can it be replaced by a database-side hash comparison: the checksum
+        # run above already is one, and this run exists to exercise the Python side.
         dl_factor = max(int(N_SAMPLES / 100_000), 2) if BENCHMARK else 2
         dl_threshold = int(N_SAMPLES / dl_factor) + 1 if BENCHMARK else math.inf
         dl_threads = N_THREADS
@@ -648,11 +760,11 @@ class TestDiffCrossDatabaseTables(unittest.TestCase):
         }
 
         if BENCHMARK:
-            print(json.dumps(result, indent=2))
-            file_name = f"benchmark_{GIT_REVISION}.jsonl"
-            with open(file_name, "a", encoding="utf-8") as file:
-                file.write(json.dumps(result) + "\n")
-                file.flush()
-            print(f"Written to {file_name}")
+            line = json.dumps(result)
+            print(line)
+            file = _benchmark_file()
+            file.write(line + "\n")
+            file.flush()
+            print(f"Written to {file.name}")
         else:
             logging.debug(json.dumps(result, indent=2))
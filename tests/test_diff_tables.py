@@ -1,92 +1,126 @@
 import datetime
+from itertools import product
 import unittest
+from unittest.mock import patch
 import uuid
 
 import preql
 import arrow  # comes with preql
 
 from data_diff.databases import connect_to_uri
-from data_diff.diff_tables import TableDiffer, TableSegment, split_space
+from data_diff.diff_tables import AUTO_BISECTION_SEGMENT_SIZE, TableDiffer, TableSegment, split_space
+from data_diff.utils import is_uuid
 
 from .common import TEST_MYSQL_CONN_STRING, str_to_checksum, random_table_suffix
 
 
 class TestUtils(unittest.TestCase):
     def test_split_space(self):
-        for i in range(0, 10):
-            for j in range(1, 16328, 17):
-                for n in range(1, 32):
-                    r = split_space(i, j + i + n, n)
-                    assert len(r) == n, f"split_space({i}, {j+n}, {n}) = {(r)}"
+        for i, j, n in product(range(0, 10), range(1, 16328, 17), range(1, 32)):
+            r = split_space(i, j + i + n, n)
+            assert len(r) == n, f"split_space({i}, {j+n}, {n}) = {(r)}"
+
+    def test_is_uuid(self):
+        u = uuid.uuid1(1)
+        assert is_uuid(str(u))
+        assert is_uuid(u.hex)
+        assert is_uuid(str(u).upper())
+        assert is_uuid("{%s}" % u)
+        assert is_uuid(u.urn)
+        assert not is_uuid("unexpected")
+        assert not is_uuid(str(u)[:-1] + "g")
+        assert not is_uuid(str(u) + " ")
+
+
+_shared_connections = None
+
+
+def _get_shared_connections():
+    "Returns the (preql, connection) pair shared by all the test classes in this module"
+    global _shared_connections
+    if _shared_connections is None:
+        _shared_connections = preql.Preql(TEST_MYSQL_CONN_STRING), connect_to_uri(TEST_MYSQL_CONN_STRING)
+    return _shared_connections
+
+
+def tearDownModule():
+    # Avoid leaking connections that require waiting for the GC, which can
+    # cause deadlocks for table-level modifications.
+    global _shared_connections
+    if _shared_connections is not None:
+        for conn in _shared_connections:
+            conn.close()
+        _shared_connections = None
 
 
 class TestWithConnection(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        # Avoid leaking connections that require waiting for the GC, which can
-        # cause deadlocks for table-level modifications.
-        cls.preql = preql.Preql(TEST_MYSQL_CONN_STRING)
-        cls.connection = connect_to_uri(TEST_MYSQL_CONN_STRING)
+        cls.preql, cls.connection = _get_shared_connections()
 
-    @classmethod
-    def tearDownClass(cls):
-        cls.preql.close()
-        cls.connection.close()
-
-    # Fallback for test runners that doesn't support setUpClass/tearDownClass
+    # Fallback for test runners that doesn't support setUpClass
     def setUp(self) -> None:
         if not hasattr(self, "connection"):
             self.setUpClass.__func__(self)
-            self.private_connection = True
 
-        table_suffix = random_table_suffix()
+        if not hasattr(self, "table_src"):  # Classes may use the same tables for all their tests
+            table_suffix = random_table_suffix()
 
-        self.table_src = f"src{table_suffix}"
-        self.table_dst = f"dst{table_suffix}"
+            self.table_src = f"src{table_suffix}"
+            self.table_dst = f"dst{table_suffix}"
 
         return super().setUp()
 
-    def tearDown(self) -> None:
-        if hasattr(self, "private_connection"):
-            self.tearDownClass.__func__(self)
 
-        return super().tearDown()
+def _add_date_rows(connection, table, rows):
+    "Inserts and commits the given (date, comment) rows into the table, in a single round-trip"
+    values = ", ".join(f"('{date.format('YYYY-MM-DD HH:mm:ss.SSSSSS')}', '{comment}')" for date, comment in rows)
+    connection.query_many([f"INSERT INTO {table}(datetime, comment) VALUES {values}", "COMMIT"], None)
 
 
 class TestDates(TestWithConnection):
-    def setUp(self):
-        super().setUp()
-        self.connection.query(f"DROP TABLE IF EXISTS {self.table_src}", None)
-        self.connection.query(f"DROP TABLE IF EXISTS {self.table_dst}", None)
-        self.preql(
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # The tests only read the tables, so they're created and seeded once for the whole class
+        table_suffix = random_table_suffix()
+        cls.table_src = f"src{table_suffix}"
+        cls.table_dst = f"dst{table_suffix}"
+        cls.preql(
             f"""
-            table {self.table_src} {{
+            table {cls.table_src} {{
                 datetime: datetime
                 comment: string
             }}
             commit()
-
-            func add(date, comment) {{
-                new {self.table_src}(date, comment)
-            }}
         """
         )
-        self.now = now = arrow.get(self.preql.now())
-        self.preql.add(now.shift(days=-50), "50 days ago")
-        self.preql.add(now.shift(hours=-3), "3 hours ago")
-        self.preql.add(now.shift(minutes=-10), "10 mins ago")
-        self.preql.add(now.shift(seconds=-1), "1 second ago")
-        self.preql.add(now, "now")
+        cls.now = now = arrow.get(cls.preql.now())
+        _add_date_rows(
+            cls.connection,
+            cls.table_src,
+            [
+                (now.shift(days=-50), "50 days ago"),
+                (now.shift(hours=-3), "3 hours ago"),
+                (now.shift(minutes=-10), "10 mins ago"),
+                (now.shift(seconds=-1), "1 second ago"),
+                (now, "now"),
+            ],
+        )
 
-        self.preql(
+        cls.preql(
             f"""
-            const table {self.table_dst} = {self.table_src}
+            const table {cls.table_dst} = {cls.table_src}
             commit()
         """
         )
 
-        self.preql.add(self.now.shift(seconds=-3), "2 seconds ago")
-        self.preql.commit()
+        _add_date_rows(cls.connection, cls.table_src, [(now.shift(seconds=-3), "2 seconds ago")])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.connection.query(f"DROP TABLE IF EXISTS {cls.table_src}, {cls.table_dst}", None)
 
     def test_init(self):
         a = TableSegment(self.connection, (self.table_src,), "id", "datetime", max_update=self.now.datetime)
@@ -132,24 +166,29 @@ class TestDates(TestWithConnection):
 
 
 class TestDiffTables(TestWithConnection):
-    def setUp(self):
-        super().setUp()
-        self.connection.query(f"DROP TABLE IF EXISTS {self.table_src}", None)
-        self.connection.query(f"DROP TABLE IF EXISTS {self.table_dst}", None)
-        self.preql(
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.differ = TableDiffer(3, 4)
+
+        # The tables are created once for the whole class, and emptied before each test
+        table_suffix = random_table_suffix()
+        cls.table_src = f"src{table_suffix}"
+        cls.table_dst = f"dst{table_suffix}"
+        cls.preql(
             f"""
             func run_sql(code) {{
                 force_eval( SQL( nulltype, code ))
             }}
 
-            table {self.table_src} {{
+            table {cls.table_src} {{
                 userid: int
                 movieid: int
                 rating: float
                 timestamp: timestamp
             }}
 
-            table {self.table_dst} {{
+            table {cls.table_dst} {{
                 userid: int
                 movieid: int
                 rating: float
@@ -158,18 +197,54 @@ class TestDiffTables(TestWithConnection):
             commit()
         """
         )
-        self.preql.commit()
+        cls.preql.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.connection.query(f"DROP TABLE IF EXISTS {cls.table_src}, {cls.table_dst}", None)
+
+    def setUp(self):
+        super().setUp()
+        # Also resets the auto-increment ids, which the tests rely on
+        self.connection.query_many([f"TRUNCATE TABLE {self.table_src}", f"TRUNCATE TABLE {self.table_dst}"], None)
 
         self.table = TableSegment(self.connection, (self.table_src,), "id", "timestamp")
         self.table2 = TableSegment(self.connection, (self.table_dst,), "id", "timestamp")
 
-        self.differ = TableDiffer(3, 4)
+        self.differ.stats.clear()
+
+    def _add_rows(self, src_rows, dst_rows):
+        "Inserts and commits (userid, movieid, rating, timestamp) rows into both tables, in a single round-trip"
+        queries = []
+        for table, rows in [(self.table_src, src_rows), (self.table_dst, dst_rows)]:
+            values = ", ".join(f"({userid}, {movieid}, {rating}, '{ts}')" for userid, movieid, rating, ts in rows)
+            queries.append(f"INSERT INTO {table}(userid, movieid, rating, timestamp) VALUES {values}")
+        self.connection.query_many(queries + ["COMMIT"], None)
 
     def test_properties_on_empty_table(self):
         table = self.table.with_schema()
         self.assertEqual(0, table.count())
         self.assertEqual(None, table.count_and_checksum()[1])
 
+    def test_schemas_queried_in_one_batch(self):
+        database = type(self.connection)
+        query_table_schemas = database.query_table_schemas
+        with patch.object(database, "query_table_schemas", autospec=True, side_effect=query_table_schemas) as m:
+            table1, table2 = self.differ._with_schemas(self.table, self.table2)
+
+        m.assert_called_once()
+        self.assertEqual({"id", "timestamp"}, set(table1._schema))
+        self.assertEqual({"id", "timestamp"}, set(table2._schema))
+
+    def test_with_schema_uses_batched_refinement(self):
+        database = type(self.connection)
+        query_table_schemas = database.query_table_schemas
+        with patch.object(database, "query_table_schemas", autospec=True, side_effect=query_table_schemas) as m:
+            table = self.table.with_schema()
+
+        m.assert_called_once()
+        self.assertEqual({"id", "timestamp"}, set(table._schema))
+
     def test_get_values(self):
         time = "2022-01-01 00:00:00.000000"
         res = self.preql(
@@ -225,6 +300,41 @@ class TestDiffTables(TestWithConnection):
         self.assertEqual(5, self.differ.stats["table1_count"])
         self.assertEqual(4, self.differ.stats["table2_count"])
 
+    def _auto_bisect(self, differ):
+        "Diffs tables with a key range of 3 * AUTO_BISECTION_SEGMENT_SIZE, and returns the bisection factor used"
+        time = "2022-01-01 00:00:00"
+        last_id = 3 * AUTO_BISECTION_SEGMENT_SIZE
+        columns = "id, userid, movieid, rating, timestamp"
+        first_row = f"(1, 1, 1, 9, '{time}')"
+        self.connection.query_many(
+            [
+                f"INSERT INTO {self.table_src}({columns}) VALUES {first_row}, ({last_id}, 2, 2, 9, '{time}')",
+                f"INSERT INTO {self.table_dst}({columns}) VALUES {first_row}",
+                "COMMIT",
+            ],
+            None,
+        )
+
+        choose_checkpoints = TableSegment.choose_checkpoints
+        with patch.object(TableSegment, "choose_checkpoints", autospec=True, side_effect=choose_checkpoints) as m:
+            diff = list(differ.diff_tables(self.table, self.table2))
+
+        self.assertEqual([("-", (str(last_id), time + ".000000"))], diff)
+        self.assertEqual(2, differ.stats["table1_count"])
+        self.assertEqual(1, differ.stats["table2_count"])
+
+        # Only the first level is bisected. It asks for bisection_factor - 1 checkpoints.
+        m.assert_called_once()
+        (_table, checkpoint_count), _kwargs = m.call_args
+        return checkpoint_count + 1
+
+    def test_auto_bisection_factor(self):
+        self.assertEqual(3, self._auto_bisect(TableDiffer(auto_bisection=True)))
+
+    def test_auto_bisection_factor_below_threshold(self):
+        # The factor is clamped below the threshold, instead of failing validation
+        self.assertEqual(2, self._auto_bisect(TableDiffer(auto_bisection=True, bisection_threshold=3)))
+
     def test_return_empty_array_when_same(self):
         time = "2022-01-01 00:00:00"
         self.preql(
@@ -240,22 +350,10 @@ class TestDiffTables(TestWithConnection):
     def test_diff_sorted_by_key(self):
         time = "2022-01-01 00:00:00"
         time2 = "2021-01-01 00:00:00"
-        self.preql(
-            f"""
-            new {self.table_src}(userid: 1, movieid: 1, rating: 9, timestamp: '{time}')
-            new {self.table_src}(userid: 2, movieid: 2, rating: 9, timestamp: '{time2}')
-            new {self.table_src}(userid: 3, movieid: 3, rating: 9, timestamp: '{time}')
-            new {self.table_src}(userid: 4, movieid: 4, rating: 9, timestamp: '{time2}')
-            new {self.table_src}(userid: 5, movieid: 5, rating: 9, timestamp: '{time}')
-
-            new {self.table_dst}(userid: 1, movieid: 1, rating: 9, timestamp: '{time}')
-            new {self.table_dst}(userid: 2, movieid: 2, rating: 9, timestamp: '{time}')
-            new {self.table_dst}(userid: 3, movieid: 3, rating: 9, timestamp: '{time}')
-            new {self.table_dst}(userid: 4, movieid: 4, rating: 9, timestamp: '{time}')
-            new {self.table_dst}(userid: 5, movieid: 5, rating: 9, timestamp: '{time}')
-        """
+        self._add_rows(
+            [(i, i, 9, time if i % 2 else time2) for i in range(1, 6)],
+            [(i, i, 9, time) for i in range(1, 6)],
         )
-        self.preql.commit()
         differ = TableDiffer()
         diff = list(differ.diff_tables(self.table, self.table2))
         expected = [
@@ -267,18 +365,21 @@ class TestDiffTables(TestWithConnection):
         self.assertEqual(expected, diff)
 
 
+# Any distinct UUIDs will do, so the rows are generated and formatted once for all the tests
+_UUIDS = [str(uuid.uuid1(i)) for i in range(100)]
+_UUID_ROWS = ", ".join(f"('{u}', '{i}')" for i, u in enumerate(_UUIDS))
+
+
 class TestStringKeys(TestWithConnection):
     def setUp(self):
         super().setUp()
 
         queries = [
-            f"DROP TABLE IF EXISTS {self.table_src}",
-            f"DROP TABLE IF EXISTS {self.table_dst}",
+            f"DROP TABLE IF EXISTS {self.table_src}, {self.table_dst}",
             f"CREATE TABLE {self.table_src}(id varchar(100), comment varchar(1000))",
             "COMMIT",
         ]
-        for i in range(100):
-            queries.append(f"INSERT INTO {self.table_src} VALUES ('{uuid.uuid1(i)}', '{i}')")
+        queries.append(f"INSERT INTO {self.table_src} VALUES {_UUID_ROWS}")
 
         queries += [
             "COMMIT",
@@ -291,8 +392,7 @@ class TestStringKeys(TestWithConnection):
 
         # TODO test unexpected values?
 
-        for query in queries:
-            self.connection.query(query, None)
+        self.connection.query_many(queries, None)
 
         self.a = TableSegment(self.connection, (self.table_src,), "id", "comment")
         self.b = TableSegment(self.connection, (self.table_dst,), "id", "comment")